@@ -176,3 +176,4 @@ def plot_embedding_as_heatmap(embed, ax=None, title="", shape=None, color_range=
 
     ax.set_xticks([]), ax.set_yticks([])
     ax.set_title(title)
+    return mappable
@@ -181,9 +181,9 @@ class Toolbox:
         self.add_real_utterance(wav, name, speaker_name)
 
     def record(self):
-        wav = self.ui.record_one(speaker_encoder_infer.sampling_rate, 5)
-        if wav is None:
-            return
+        self.ui.record_one(speaker_encoder_infer.sampling_rate, 5, self.on_recorded)
+
+    def on_recorded(self, wav):
         self.ui.play(wav, speaker_encoder_infer.sampling_rate)
 
         speaker_name = "user01"
@@ -223,10 +223,11 @@ class Toolbox:
 
         # Plot it
         self.ui.draw_embed(speaker_embed, emotion_embed, name, "current")
-        self.ui.draw_umap_projections(self.utterances)
-        self.ui.wav_ori_fig.savefig(f"toolbox_results/{name}_info.png", dpi=500)
+        umap_fpath = None
         if len(self.utterances) >= self.ui.min_umap_points:
-            self.ui.umap_fig.savefig(f"toolbox_results/umap_{len(self.utterances)}.png", dpi=500)
+            umap_fpath = f"toolbox_results/umap_{len(self.utterances)}.png"
+        self.ui.draw_umap_projections(self.utterances, umap_fpath)
+        self.ui.wav_ori_fig.savefig(f"toolbox_results/{name}_info.png", dpi=500)
 
     def clear_utterances(self):
         self.utterances.clear()
@@ -236,6 +237,7 @@ class Toolbox:
         self.start_generate_time = time.time()
         self.ui.log("Generating the mel spectrogram...")
         self.ui.set_loading(1)
+        self.ui.pump_events()
 
         # Update the synthesizer random seed
         if self.ui.random_seed_checkbox.isChecked():
@@ -301,6 +303,7 @@ class Toolbox:
                    % (i * b_size, seq_len * b_size, b_size, gen_rate, real_time_factor)
             self.ui.log(line, "overwrite")
             self.ui.set_loading(i, seq_len)
+            self.ui.pump_events()
         if self.ui.current_vocoder_fpath is not None and not self.ui.griffin_lim_checkbox.isChecked():
             self.ui.log("")
             wav = vocoder.infer_waveform(spec, target=vocoder.hp.voc_target, overlap=vocoder.hp.voc_overlap, crossfade=vocoder.hp.is_crossfade, progress_callback=vocoder_progress) 
@@ -379,10 +382,11 @@ class Toolbox:
 
         # Plot it
         self.ui.draw_embed(speaker_embed, emotion_embed, name, "generated")
-        self.ui.draw_umap_projections(self.utterances)
-        self.ui.wav_gen_fig.savefig(f"toolbox_results/{name}_info.png", dpi=500)
+        umap_fpath = None
         if len(self.utterances) >= self.ui.min_umap_points:
-            self.ui.umap_fig.savefig(f"toolbox_results/umap_{len(self.utterances)}.png", dpi=500)
+            umap_fpath = f"toolbox_results/umap_{len(self.utterances)}.png"
+        self.ui.draw_umap_projections(self.utterances, umap_fpath)
+        self.ui.wav_gen_fig.savefig(f"toolbox_results/{name}_info.png", dpi=500)
         os.remove(fix_file)
 
     def init_speaker_encoder(self):
@@ -390,6 +394,7 @@ class Toolbox:
 
         self.ui.log("Loading the speaker encoder %s... " % model_fpath)
         self.ui.set_loading(1)
+        self.ui.pump_events()
         start = timer()
         speaker_encoder_infer.load_model(model_fpath)
         self.ui.log("Done (%dms)." % int(1000 * (timer() - start)), "append")
@@ -400,6 +405,7 @@ class Toolbox:
 
         self.ui.log("Loading the emotion encoder %s... " % model_fpath)
         self.ui.set_loading(1)
+        self.ui.pump_events()
         start = timer()
         
         ### prepare the emotion encoder ###
@@ -428,6 +434,7 @@ class Toolbox:
 
         self.ui.log("Loading the synthesizer %s... " % model_fpath)
         self.ui.set_loading(1)
+        self.ui.pump_events()
         start = timer()
         self.synthesizer = Synthesizer_infer(model_fpath, model_name="EmotionTacotron")
         self.ui.log("Done (%dms)." % int(1000 * (timer() - start)), "append")
@@ -441,6 +448,7 @@ class Toolbox:
 
         self.ui.log("Loading the vocoder %s... " % model_fpath)
         self.ui.set_loading(1)
+        self.ui.pump_events()
         start = timer()
         vocoder.load_model(model_fpath)
         self.ui.log("Done (%dms)." % int(1000 * (timer() - start)), "append")
@@ -1,17 +1,18 @@
+import hashlib
+import random
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from time import sleep
 from typing import List, Set
 from warnings import filterwarnings, warn
 
 import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-import pandas as pd
 import sounddevice as sd
 import soundfile as sf
-import umap
-from PyQt5.QtCore import Qt, QStringListModel
+from PyQt5.QtCore import Qt, QRunnable, QStringListModel, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QTextCursor
 from PyQt5.QtWidgets import *
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
@@ -36,56 +37,92 @@ colormap = np.array([
     [0, 0, 0],
     [183, 183, 183],
     [76, 255, 0],
-], dtype=np.float) / 255
+], dtype=np.float32) / 255
+
+rng = random.Random()
+
+audio_extensions = {".mp3", ".flac", ".wav", ".m4a"}
 
 default_text = \
     "I visited museums and sat in public gardens"
 
 
+class Runnable(QRunnable):
+    """
+    Wraps a function so that it can be started on a QThreadPool
+    """
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+
+    def run(self):
+        self.fn()
+
+
 class UI(QDialog):
     min_umap_points = 4
     max_log_lines = 5
     max_log_width = 100
     max_saved_utterances = 20
 
+    # (request id, "speaker" or "emotion", embeddings hash, projections)
+    umap_done = pyqtSignal(int, str, object, object)
+    record_done = pyqtSignal(bool)
+
+    @staticmethod
+    def _style_blank(ax, keep_frame=False):
+        # Without the frame, the axes background isn't drawn either
+        if keep_frame:
+            ax.set_xticks([])
+            ax.set_yticks([])
+        else:
+            ax.set_axis_off()
+        ax.set_aspect("equal", "datalim")
+
     def draw_utterance(self, utterance: Utterance, which):
         self.draw_spec(utterance.spec, which)
         self.draw_embed(utterance.speaker_embed, utterance.emotion_embed, utterance.name, which)
 
     def draw_embed(self, speaker_embed, emotion_embed, name, which):
+        # Skip the redraw if these embeddings are already displayed
+        last = self._last_embeds[which]
+        if last is not None and last[0] is speaker_embed and last[1] is emotion_embed \
+                and last[2] == name:
+            return
+        self._last_embeds[which] = (speaker_embed, emotion_embed, name)
+
         speaker_embed_ax, emotion_embed_ax, _ = self.current_ax if which == "current" else self.gen_ax
         speaker_embed_ax.figure.suptitle("" if speaker_embed is None else name)
         emotion_embed_ax.figure.suptitle("" if emotion_embed is None else name)
 
-        ## Speaker Embedding
-        # Clear the plot
-        if len(speaker_embed_ax.images) > 0:
-            speaker_embed_ax.images[0].colorbar.remove()
-        speaker_embed_ax.clear()
-
-        # Draw the embed
-        if speaker_embed is not None:
-            plot_embedding_as_heatmap(speaker_embed, speaker_embed_ax)
-            speaker_embed_ax.set_title("speaker embed")
-        speaker_embed_ax.set_aspect("equal", "datalim")
-        speaker_embed_ax.set_xticks([])
-        speaker_embed_ax.set_yticks([])
-        speaker_embed_ax.figure.canvas.draw()
-
-        ## Emotion Embedding
-        # Clear the plot
-        if len(emotion_embed_ax.images) > 0:
-            emotion_embed_ax.images[0].colorbar.remove()
-        emotion_embed_ax.clear()
-
-        # Draw the embed
-        if emotion_embed is not None:
-            plot_embedding_as_heatmap(emotion_embed, emotion_embed_ax, shape=(13, 3))
-            emotion_embed_ax.set_title("emotion embed")
-        emotion_embed_ax.set_aspect("equal", "datalim")
-        emotion_embed_ax.set_xticks([])
-        emotion_embed_ax.set_yticks([])
-        emotion_embed_ax.figure.canvas.draw()
+        self._draw_embed_heatmap(speaker_embed_ax, speaker_embed, "speaker embed")
+        self._draw_embed_heatmap(emotion_embed_ax, emotion_embed, "emotion embed", shape=(13, 3))
+
+        # Both axes share the same figure, a single repaint is enough
+        emotion_embed_ax.figure.canvas.draw_idle()
+
+    def _draw_embed_heatmap(self, ax, embed, title, shape=None):
+        # Update the heatmap already on the axes in place when the embedding has the same shape
+        img = self._embed_images.get(ax)
+        if embed is not None:
+            if shape is None:
+                shape = (int(np.sqrt(len(embed))), -1)
+            data = embed.reshape(shape)
+            if img is not None and img.get_array().shape == data.shape:
+                img.set_data(data)
+                img.set_clim(data.min(), data.max())
+                return
+
+        # Otherwise clear the plot and draw the embed from scratch
+        if img is not None:
+            img.colorbar.remove()
+        ax.clear()
+        img = None
+        if embed is not None:
+            img = plot_embedding_as_heatmap(embed, ax, shape=shape)
+            ax.set_title(title)
+        self._embed_images[ax] = img
+        self._style_blank(ax)
 
     def draw_spec(self, spec, which):
         _, _, spec_ax = self.current_ax if which == "current" else self.gen_ax
@@ -97,100 +134,139 @@ class UI(QDialog):
             spec_ax.imshow(spec, aspect="auto", interpolation="none")
             spec_ax.set_title("mel spectrogram")
 
-        spec_ax.set_xticks([])
-        spec_ax.set_yticks([])
-        spec_ax.figure.canvas.draw()
+        spec_ax.set_axis_off()
+        spec_ax.figure.canvas.draw_idle()
         if which != "current":
             self.vocode_button.setDisabled(spec is None)
 
-    def draw_umap_projections(self, utterances: Set[Utterance]):
-        def umap_progress(i, seq_len):
-            self.set_loading(i, seq_len)
-        speaker_umap_ax, emotion_umap_ax = self.umap_ax
-
-        # draw speaker embeddings umap 
-        speaker_umap_ax.clear()
-
-        utterances = list(utterances)
-        speakers = np.unique([u.speaker_name for u in utterances])
-        colors = {speaker_name: colormap[i] for i, speaker_name in enumerate(speakers)}
-        embeds = [u.speaker_embed for u in utterances]
+    def draw_umap_projections(self, utterances: Set[Utterance], save_fpath=None):
+        """
+        Projects the speaker and emotion embeddings of the utterances with UMAP. The reductions
+        run one after the other on a background thread and each panel is drawn once its
+        projections are ready. If <save_fpath> is given, the figure is saved there once both
+        panels are drawn.
+        """
+        # Cancel the reductions of the previous call that haven't started yet
+        for future in self._umap_futures:
+            future.cancel()
+        self._umap_futures = []
+        if len(self._umap_pending) > 0 and self._umap_save_fpath is not None:
+            self.log("Skipped saving %s, the projections were redrawn before being ready." %
+                     self._umap_save_fpath)
+
+        self._umap_request += 1
+        self._umap_utterances = utterances = list(utterances)
+        self._umap_save_fpath = save_fpath
+
+        # The colors and markers of the points are the same for both projections
+        speakers = sorted({u.speaker_name for u in utterances})
+        speaker_ids = {speaker_name: i for i, speaker_name in enumerate(speakers)}
+        self._umap_colors = colormap[[speaker_ids[u.speaker_name] for u in utterances]]
+        self._umap_synth = np.fromiter((u.synth for u in utterances), dtype=bool,
+                                       count=len(utterances))
+
+        self._umap_pending = {"speaker", "emotion"}
+        self._start_umap("speaker")
+        self._start_umap("emotion")
+
+    def _start_umap(self, which):
+        utterances = self._umap_utterances
+        umap_ax = self.umap_ax[0 if which == "speaker" else 1]
+        umap_ax.clear()
 
         # Display a message if there aren't enough points
         if len(utterances) < self.min_umap_points:
-            speaker_umap_ax.text(.5, .5, "Add %d more points to\ngenerate the projections" %
-                              (self.min_umap_points - len(utterances)),
-                              horizontalalignment='center', fontsize=15)
-
-        # Compute the projections
+            umap_ax.text(.5, .5, "Add %d more points to\ngenerate the projections" %
+                         (self.min_umap_points - len(utterances)),
+                         horizontalalignment='center', fontsize=15)
+            self._on_umap_done(self._umap_request, which, None, None)
+            return
+
+        # Reuse the last projections if the embeddings haven't changed
+        if which == "speaker":
+            embeds = [u.speaker_embed for u in utterances]
         else:
-            if not self.umap_hot:
-                self.log(
-                    "Drawing UMAP projections for the first time, this will take a few seconds.")
-                self.umap_hot = True
-
-            reducer = umap.UMAP(int(np.ceil(np.sqrt(len(embeds)))), metric="cosine")
-            projections = reducer.fit_transform(embeds)
-
-            colors = [colors[u.speaker_name] for u in utterances]
-            markers = ["x" if "_gen_" in u.name else "o" for u in utterances]
-            # labels = [u.speaker_name for u in utterances]
-            # speakers_done.add(utterance.speaker_name)
-            i = 0
-            for x, y, c, m in zip(projections[:, 0], projections[:,1], colors, markers):
-                i+=1
-                speaker_umap_ax.scatter(x=x, y=y, c=c, marker=m)
-                self.set_loading(i, projections.shape[0])
-            speaker_umap_ax.set_title("Speaker Embedding UMAP")
-            self.set_loading(0)
+            embeds = [u.emotion_embed for u in utterances]
+        embeds = np.ascontiguousarray(np.stack(embeds), dtype=np.float32)
+        key = hashlib.blake2b(embeds.tobytes(), digest_size=16).digest()
+        if self._umap_cache[which][0] == key:
+            self._on_umap_done(self._umap_request, which, key, self._umap_cache[which][1])
+            return
 
-        # Draw the plot
-        speaker_umap_ax.set_aspect("equal", "datalim")
-        speaker_umap_ax.set_xticks([])
-        speaker_umap_ax.set_yticks([])
-        speaker_umap_ax.figure.canvas.draw()
-
-        # draw emotion embeddings umap 
-        emotion_umap_ax.clear()
+        # Compute the projections
+        if not self.umap_hot:
+            self.log("Drawing UMAP projections for the first time, this will take a few seconds.")
+            self.umap_hot = True
+        self.set_loading(1)
+        future = self._umap_executor.submit(self._fit_umap, self._umap_request, which, key, embeds)
+        self._umap_futures.append(future)
 
-        utterances = list(utterances)
-        speakers = np.unique([u.speaker_name for u in utterances])
-        colors = {speaker_name: colormap[i] for i, speaker_name in enumerate(speakers)}
-        embeds = [u.emotion_embed for u in utterances]
+    @staticmethod
+    def _make_reducer(n_points):
+        # Imported on first use, the UMAP import chain is slow and is first hit by the warm-up in
+        # the background
+        import umap
+
+        # Tuned for the few dozen points the toolbox deals with: the spectral initialization
+        # would dominate the fit time at this scale
+        return umap.UMAP(n_neighbors=max(2, int(np.ceil(np.sqrt(n_points)))), metric="cosine",
+                         init="random", n_jobs=-1, n_epochs=200)
+
+    def _warm_up_umap(self):
+        # Triggers the numba compilation of UMAP ahead of the first projections
+        try:
+            with self._umap_lock:
+                self._make_reducer(8).fit(np.random.rand(8, 16).astype(np.float32))
+        except Exception as e:
+            print(e)
 
-        # Display a message if there aren't enough points
-        if len(utterances) < self.min_umap_points:
-            emotion_umap_ax.text(.5, .5, "Add %d more points to\ngenerate the projections" %
-                              (self.min_umap_points - len(utterances)),
-                              horizontalalignment='center', fontsize=15)
-            
-        # Compute the projections
-        else:
-            if not self.umap_hot:
-                self.log(
-                    "Drawing UMAP projections for the first time, this will take a few seconds.")
-                self.umap_hot = True
-
-            reducer = umap.UMAP(int(np.ceil(np.sqrt(len(embeds)))), metric="cosine")
-            projections = reducer.fit_transform(embeds)
-
-            colors = [colors[u.speaker_name] for u in utterances]
-            markers = ["x" if "_gen_" in u.name else "o" for u in utterances]
-            # labels = [u.speaker_name for u in utterances]
-            # speakers_done.add(utterance.speaker_name)
-            i = 0
-            for x, y, c, m in zip(projections[:, 0], projections[:,1], colors, markers):
-                i+=1
-                emotion_umap_ax.scatter(x=x, y=y, c=c, marker=m)
-                self.set_loading(i, projections.shape[0])
-            emotion_umap_ax.set_title("Emotion Embedding UMAP")
+    def _fit_umap(self, request, which, key, embeds):
+        # Runs on a worker thread, the result is handed back to the GUI thread through a signal
+        try:
+            with self._umap_lock:
+                projections = self._make_reducer(len(embeds)).fit_transform(embeds)
+        except Exception as e:
+            print(e)
+            projections = None
+        self.umap_done.emit(request, which, key, projections)
+
+    def _on_umap_done(self, request, which, key, projections):
+        # Drop the results of a reduction that was superseded by a more recent call
+        if request != self._umap_request:
+            return
+        if projections is not None:
+            self._umap_cache[which] = (key, projections)
+        elif key is not None:
+            self.log("Could not compute the %s UMAP projections." % which)
+        umap_ax = self.umap_ax[0 if which == "speaker" else 1]
+        self._draw_one_umap(umap_ax, projections, "%s Embedding UMAP" % which.capitalize())
+
+        self._umap_pending.discard(which)
+        if len(self._umap_pending) == 0:
             self.set_loading(0)
+            if self._umap_save_fpath is not None:
+                self.umap_fig.savefig(self._umap_save_fpath, dpi=500)
+
+    def _draw_one_umap(self, umap_ax, projections, title):
+        if projections is not None:
+            # The bounds are known already, no need for matplotlib to autoscale on each scatter
+            umap_ax.set_autoscale_on(False)
+            mins, maxs = projections.min(axis=0), projections.max(axis=0)
+            pad = 0.05 * (maxs - mins)
+            umap_ax.set_xlim(mins[0] - pad[0], maxs[0] + pad[0])
+            umap_ax.set_ylim(mins[1] - pad[1], maxs[1] + pad[1])
+
+            # Draw all the points sharing a marker in a single scatter call
+            # Generated utterances are drawn with crosses, the others with circles
+            for m, mask in (("o", ~self._umap_synth), ("x", self._umap_synth)):
+                if mask.any():
+                    umap_ax.scatter(projections[mask, 0], projections[mask, 1],
+                                    c=self._umap_colors[mask], marker=m)
+            umap_ax.set_title(title)
 
         # Draw the plot
-        emotion_umap_ax.set_aspect("equal", "datalim")
-        emotion_umap_ax.set_xticks([])
-        emotion_umap_ax.set_yticks([])
-        emotion_umap_ax.figure.canvas.draw()
+        self._style_blank(umap_ax, keep_frame=True)
+        umap_ax.figure.canvas.draw_idle()
 
     def save_audio_file(self, wav, sample_rate):
         dialog = QFileDialog()
@@ -252,7 +328,15 @@ class UI(QDialog):
         # If None, sounddevice queries portaudio
         sd.default.device = (self.audio_in_device, output_device)
 
+    @property
+    def is_recording(self):
+        return self._record is not None
+
     def play(self, wav, sample_rate):
+        # Any call to sounddevice would abort the recording stream
+        if self.is_recording:
+            self.log("Can't play audio while recording.")
+            return
         try:
             sd.stop()
             sd.play(wav, sample_rate)
@@ -262,9 +346,14 @@ class UI(QDialog):
             self.log("Your device must be connected before you start the toolbox.")
 
     def stop(self):
-        sd.stop()
+        if not self.is_recording:
+            sd.stop()
 
-    def record_one(self, sample_rate, duration):
+    def record_one(self, sample_rate, duration, on_done):
+        """
+        Starts recording <duration> seconds of audio without blocking the interface. <on_done> is
+        called with the recorded wav once the recording is over.
+        """
         self.record_button.setText("Recording...")
         self.record_button.setDisabled(True)
 
@@ -276,19 +365,45 @@ class UI(QDialog):
             print(e)
             self.log("Could not record anything. Is your recording device enabled?")
             self.log("Your device must be connected before you start the toolbox.")
-            return None
+            return
+
+        # The progress bar is advanced by the timer every 100ms
+        self._record = (wav, duration, on_done)
+        self._record_ticks = 0
+        self.record_timer.start()
+
+    def _record_tick(self):
+        _, duration, _ = self._record
+        self._record_ticks += 1
+        self.set_loading(self._record_ticks * 0.1, duration)
+        if self._record_ticks >= duration * 10:
+            self.record_timer.stop()
+            # Wait for the end of the recording on a worker thread
+            QThreadPool.globalInstance().start(Runnable(self._wait_record))
+
+    def _wait_record(self):
+        # Always hand control back to the GUI thread, or the record button would stay disabled
+        success = False
+        try:
+            sd.wait()
+            success = True
+        except Exception as e:
+            print(e)
+        finally:
+            self.record_done.emit(success)
 
-        for i in np.arange(0, duration, 0.1):
-            self.set_loading(i, duration)
-            sleep(0.1)
-        self.set_loading(duration, duration)
-        sd.wait()
+    def _on_record_done(self, success):
+        wav, _, on_done = self._record
+        self._record = None
 
-        self.log("Done recording.")
         self.record_button.setText("Record")
         self.record_button.setDisabled(False)
+        if not success:
+            self.log("Could not record anything. Is your recording device enabled?")
+            return
+        self.log("Done recording.")
 
-        return wav.squeeze()
+        on_done(wav.squeeze())
 
     @property
     def current_dataset_name(self):
@@ -311,23 +426,30 @@ class UI(QDialog):
         return Path(fpath[0]) if fpath[0] != "" else ""
 
     @staticmethod
-    def repopulate_box(box, items, random=False):
+    def repopulate_box(box, items, pick_random=False):
         """
         Resets a box and adds a list of items. Pass a list of (item, data) pairs instead to join
         data to the items
         """
         box.blockSignals(True)
+        box.setUpdatesEnabled(False)
         box.clear()
-        for item in items:
-            item = list(item) if isinstance(item, tuple) else [item]
-            box.addItem(str(item[0]), *item[1:])
+
+        # Insert all the items at once, then join the data if there is any
+        items = [tuple(item) if isinstance(item, tuple) else (item,) for item in items]
+        box.addItems([str(item[0]) for item in items])
+        for i, item in enumerate(items):
+            if len(item) > 1:
+                box.setItemData(i, item[1])
+
         if len(items) > 0:
-            box.setCurrentIndex(np.random.randint(len(items)) if random else 0)
+            box.setCurrentIndex(rng.randrange(len(items)) if pick_random else 0)
         box.setDisabled(len(items) == 0)
+        box.setUpdatesEnabled(True)
         box.blockSignals(False)
 
     def populate_browser(self, datasets_root: Path, recognized_datasets: List, level: int,
-                         random=True):
+                         pick_random=True):
         # Select a random dataset
         if level <= 0:
             if datasets_root is not None:
@@ -353,13 +475,13 @@ class UI(QDialog):
                 self.browser_load_button.setDisabled(True)
                 self.auto_next_checkbox.setDisabled(True)
                 return
-            self.repopulate_box(self.dataset_box, datasets, random)
+            self.repopulate_box(self.dataset_box, datasets, pick_random)
 
         # Select a random speaker
         if level <= 1:
             speakers_root = datasets_root.joinpath(self.current_dataset_name)
             speaker_names = [d.stem for d in speakers_root.glob("*") if d.is_dir()]
-            self.repopulate_box(self.speaker_box, speaker_names, random)
+            self.repopulate_box(self.speaker_box, speaker_names, pick_random)
 
         # Select a random utterance
         if level <= 2:
@@ -367,11 +489,9 @@ class UI(QDialog):
                 self.current_dataset_name,
                 self.current_speaker_name
             )
-            utterances = []
-            for extension in ['mp3', 'flac', 'wav', 'm4a']:
-                utterances.extend(Path(utterances_root).glob("**/*.%s" % extension))
-            utterances = [fpath.relative_to(utterances_root) for fpath in utterances]
-            self.repopulate_box(self.utterance_box, utterances, random)
+            utterances = [fpath.relative_to(utterances_root) for fpath in utterances_root.rglob("*")
+                          if fpath.suffix.lower() in audio_extensions]
+            self.repopulate_box(self.utterance_box, utterances, pick_random)
 
     def browser_select_next(self):
         index = (self.utterance_box.currentIndex() + 1) % len(self.utterance_box)
@@ -436,31 +556,26 @@ class UI(QDialog):
 
     def log(self, line, mode="newline"):
         if mode == "newline":
-            if len(line) > self.max_log_width:
-                num_lines = len(line) // self.max_log_width
-                res = len(line) - (len(line) // self.max_log_width) * self.max_log_width
-                for l in range(num_lines):
-                    self.logs.append(line[l *self.max_log_width : (l+1)*self.max_log_width])
-                    if len(self.logs) > self.max_log_lines:
-                        del self.logs[0]
-                self.logs.append(line[-res-1: ])
-            else:             
-                self.logs.append(line)
-            if len(self.logs) > self.max_log_lines:
-                del self.logs[0]
-        elif mode == "append":
-            self.logs[-1] += line
-        elif mode == "overwrite":
-            self.logs[-1] = line
-        log_text = '\n'.join(self.logs)
-
-        self.log_window.setText(log_text)
-        self.app.processEvents()
+            # Split the lines that are too long, the window keeps at most max_log_lines of them
+            for k in range(0, max(len(line), 1), self.max_log_width):
+                self.log_window.appendPlainText(line[k:k + self.max_log_width])
+        elif mode in ("append", "overwrite"):
+            cursor = self.log_window.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            if mode == "overwrite":
+                cursor.movePosition(QTextCursor.StartOfBlock, QTextCursor.KeepAnchor)
+            cursor.insertText(line)
 
     def set_loading(self, value, maximum=1):
         self.loading_bar.setValue(value * 100)
         self.loading_bar.setMaximum(maximum * 100)
         self.loading_bar.setTextVisible(value != 0)
+
+    def pump_events(self):
+        """
+        Repaints the interface in the middle of a long task running on the GUI thread. The event
+        loop otherwise handles repaints on its own, so call this sparingly.
+        """
         self.app.processEvents()
 
     def populate_gen_options(self, seed, trim_silences):
@@ -496,7 +611,7 @@ class UI(QDialog):
         self.vocode_button.setDisabled(True)
         self.replay_wav_button.setDisabled(True)
         self.export_wav_button.setDisabled(True)
-        [self.log("") for _ in range(self.max_log_lines)]
+        self.log_window.clear()
 
     def __init__(self):
         ## Initialize the application
@@ -531,8 +646,24 @@ class UI(QDialog):
         # UMap
         self.umap_fig, self.umap_ax = plt.subplots(2, 1, figsize=(3, 3), facecolor="#F0F0F0")
         self.umap_fig.subplots_adjust(left=0.02, bottom=0.02, right=0.98, top=0.9)
-        self.projections_layout.addWidget(FigureCanvas(self.umap_fig))
+        umap_canvas = FigureCanvas(self.umap_fig)
+        # The canvas paints its whole area, Qt doesn't need to clear the background first
+        umap_canvas.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.projections_layout.addWidget(umap_canvas)
         self.umap_hot = False
+        self._umap_cache = {"speaker": (None, None), "emotion": (None, None)}
+        # A single worker: numba's parallel kernels can't be launched from several threads at once
+        self._umap_executor = ThreadPoolExecutor(max_workers=1)
+        self._umap_futures = []
+        self._umap_request = 0
+        self._umap_pending = set()
+        self._umap_save_fpath = None
+        self.app.aboutToQuit.connect(
+            lambda: self._umap_executor.shutdown(wait=False, cancel_futures=True))
+        self.umap_done.connect(self._on_umap_done)
+        # Fits never overlap, n_jobs=-1 within a fit is the only parallelism
+        self._umap_lock = threading.Lock()
+        threading.Thread(target=self._warm_up_umap, daemon=True).start()
         self.clear_button = QPushButton("Clear")
         self.projections_layout.addWidget(self.clear_button)
 
@@ -576,6 +707,11 @@ class UI(QDialog):
         browser_layout.addWidget(self.browser_browse_button, i, 0)
         self.record_button = QPushButton("Record")
         browser_layout.addWidget(self.record_button, i, 1)
+        self.record_timer = QTimer(self)
+        self.record_timer.setInterval(100)
+        self.record_timer.timeout.connect(self._record_tick)
+        self._record = None
+        self.record_done.connect(self._on_record_done)
         self.play_button = QPushButton("Play")
         browser_layout.addWidget(self.play_button, i, 2)
         self.stop_button = QPushButton("Stop")
@@ -632,6 +768,9 @@ class UI(QDialog):
         self.wav_gen_fig.subplots_adjust(left=0, bottom=0.1, right=1, top=0.8)
         vis_layout.addWidget(FigureCanvas(self.wav_gen_fig))
 
+        self._last_embeds = {"current": None, "generated": None}
+        self._embed_images = {}
+
         for ax in self.current_ax.tolist() + self.gen_ax.tolist():
             ax.set_facecolor("#F0F0F0")
             for side in ["top", "right", "bottom", "left"]:
@@ -673,10 +812,13 @@ class UI(QDialog):
         self.loading_bar = QProgressBar()
         gen_layout.addWidget(self.loading_bar)
 
-        self.log_window = QLabel()
-        self.log_window.setAlignment(Qt.AlignBottom | Qt.AlignLeft)
+        self.log_window = QPlainTextEdit()
+        self.log_window.setReadOnly(True)
+        self.log_window.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.log_window.document().setMaximumBlockCount(self.max_log_lines)
+        self.log_window.setFixedHeight(
+            self.log_window.fontMetrics().lineSpacing() * (self.max_log_lines + 1))
         gen_layout.addWidget(self.log_window)
-        self.logs = []
         # gen_layout.addStretch()
 
 